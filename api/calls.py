@@ -7,7 +7,7 @@ from typing import Optional, List
 import os
 from database import get_db
 from models import Call, CallInteraction
-from services.call_launcher import launch_call
+from services.call_launcher import launch_call_async
 from logger_config import get_logger
 from config import RECORDINGS_PATH
 
@@ -73,7 +73,7 @@ async def launch_single_call(request: LaunchCallRequest, db: Session = Depends(g
             raise HTTPException(status_code=400, detail=f"Invalid scenario. Must be: production")
         
         # Launch call via ARI
-        call_id = launch_call(
+        call_id = await launch_call_async(
             phone_number=request.phone_number,
             scenario=request.scenario,
             campaign_id=request.campaign_id
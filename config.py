@@ -77,6 +77,7 @@ AMD_MACHINE_SPEECH_THRESHOLD = float(os.getenv("AMD_MACHINE_SPEECH_THRESHOLD", "
 AMD_HUMAN_SPEECH_THRESHOLD = float(os.getenv("AMD_HUMAN_SPEECH_THRESHOLD", "1.2"))  # secondes
 AMD_SILENCE_THRESHOLD = float(os.getenv("AMD_SILENCE_THRESHOLD", "0.9"))  # secondes
 AMD_BEEP_DETECTION_ENABLED = os.getenv("AMD_BEEP_DETECTION_ENABLED", "true").lower() == "true"
+AMD_FFT_WORKERS = int(os.getenv("AMD_FFT_WORKERS", "2"))  # threads FFT par analyse (borné: analyses concurrentes)
 
 # =============================================================================
 # AUDIO & CHEMINS (Configuration existante gardée)
@@ -6,8 +6,9 @@ Système de logging centralisé avec debug complet pour tous les scripts
 
 import logging
 import logging.handlers
-import os
 import sys
+import queue
+import atexit
 from datetime import datetime
 from pathlib import Path
 import json
@@ -27,6 +28,7 @@ except ImportError:
 DEFAULT_LOG_LEVEL = logging.DEBUG
 DEFAULT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(funcName)s() - %(message)s'
 DEFAULT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_SEPARATOR = "=" * 60
 
 # Couleurs pour la console
 class Colors:
@@ -53,10 +55,11 @@ class UltraDetailedFormatter(logging.Formatter):
     
     def format(self, record):
         # Ajouter informations système
+        # Thread/process d'origine (le formatage se fait dans le thread d'écriture des logs)
         if not hasattr(record, 'thread_name'):
-            record.thread_name = threading.current_thread().name
+            record.thread_name = record.threadName
         if not hasattr(record, 'process_id'):
-            record.process_id = os.getpid()
+            record.process_id = record.process
         if not hasattr(record, 'memory_mb'):
             if PSUTIL_AVAILABLE:
                 try:
@@ -155,6 +158,8 @@ def setup_logging(
     if logger.handlers:
         return logger
     
+    handlers = []
+    
     # Handler pour fichier principal avec rotation
     if file_output:
         log_file = log_dir / f"{name}.log"
@@ -177,7 +182,7 @@ def setup_logging(
         file_formatter = logging.Formatter(file_format, DEFAULT_DATE_FORMAT)
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(log_level)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
         
         # Handler séparé pour les erreurs
         error_file = log_dir / f"{name}_errors.log"
@@ -189,7 +194,7 @@ def setup_logging(
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
-        logger.addHandler(error_handler)
+        handlers.append(error_handler)
         
         # Handler pour debug ultra-détaillé
         debug_file = log_dir / f"{name}_debug.log"
@@ -201,7 +206,7 @@ def setup_logging(
         )
         debug_handler.setLevel(logging.DEBUG)
         debug_handler.setFormatter(file_formatter)
-        logger.addHandler(debug_handler)
+        handlers.append(debug_handler)
     
     # Handler pour console avec couleurs
     if console_output:
@@ -212,7 +217,16 @@ def setup_logging(
             console_formatter = logging.Formatter(DEFAULT_LOG_FORMAT, DEFAULT_DATE_FORMAT)
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(log_level)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    # Écritures fichiers/console déportées dans un thread dédié:
+    # le thread appelant (ex: boucle d'appel ARI) ne fait qu'un put() en file
+    if handlers:
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return logger
 
@@ -342,6 +356,10 @@ def log_memory_usage(func):
     
     return wrapper
 
+def log_banner(logger: logging.Logger, title: str):
+    """Log une bannière (séparateur / titre / séparateur) en un seul enregistrement"""
+    logger.info("%s\n%s\n%s", LOG_SEPARATOR, title, LOG_SEPARATOR, stacklevel=2)
+
 def log_system_info(logger: logging.Logger = None):
     """Log les informations système détaillées"""
     if logger is None:
@@ -350,9 +368,7 @@ def log_system_info(logger: logging.Logger = None):
     try:
         import platform
         
-        logger.info("=" * 60)
-        logger.info("🖥️  SYSTEM INFORMATION")
-        logger.info("=" * 60)
+        log_banner(logger, "🖥️  SYSTEM INFORMATION")
         logger.info(f"Platform: {platform.platform()}")
         logger.info(f"Architecture: {platform.architecture()}")
         logger.info(f"Processor: {platform.processor()}")
@@ -372,7 +388,7 @@ def log_system_info(logger: logging.Logger = None):
             logger.info(f"Process PID: {process.pid}")
             logger.info(f"Process Memory: {process.memory_info().rss // (1024**2)}MB")
         
-        logger.info("=" * 60)
+        logger.info(LOG_SEPARATOR)
         
     except Exception as e:
         logger.error(f"Failed to log system info: {e}")
@@ -390,9 +406,7 @@ def log_performance_summary(logger: logging.Logger = None):
     if not stats:
         return
     
-    logger.info("=" * 60)
-    logger.info("📊 PERFORMANCE SUMMARY")
-    logger.info("=" * 60)
+    log_banner(logger, "📊 PERFORMANCE SUMMARY")
     
     for func_name, data in sorted(stats.items(), key=lambda x: x[1]['total_time'], reverse=True)[:10]:
         logger.info(
@@ -403,7 +417,7 @@ def log_performance_summary(logger: logging.Logger = None):
             f"failures: {data['failures']}"
         )
     
-    logger.info("=" * 60)
+    logger.info(LOG_SEPARATOR)
 
 # Fonction de compatibilité avec l'ancien système
 def setup_logger(name: str, log_file: str = None, level=logging.DEBUG):
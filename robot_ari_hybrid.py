@@ -11,11 +11,14 @@ import websocket
 import time
 import os
 import threading
+import itertools
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from sqlalchemy.orm import Session
-from database import SessionLocal
-from models import Call
+from sqlalchemy import insert, update
+from database import engine
+from models import Call, Contact
 from logger_config import get_logger
 from typing import Dict, Optional, Any, Callable
 
@@ -41,12 +44,56 @@ except Exception as e:
 
 # Scénarios streaming
 try:
-    from scenarios_streaming import scenario_test_streaming, scenario_production_streaming
+    from scenarios_streaming import scenario_test_streaming, scenario_production_streaming, STEP_MAX_WAIT
     SCENARIOS_AVAILABLE = True
     logger.info("✅ Streaming scenarios imported successfully")
 except Exception as e:
     logger.error(f"❌ Failed to load streaming scenarios: {e}")
     SCENARIOS_AVAILABLE = False
+    STEP_MAX_WAIT = {}
+
+# Temps d'écoute par étape, résolus une seule fois depuis la table aplatie des scénarios
+def _step_wait(step_name: str, default: float) -> float:
+    return STEP_MAX_WAIT.get(step_name, default)
+
+_HELLO_WAIT = _step_wait("hello", 15.0)
+_RETRY_WAIT = _step_wait("retry", 15.0)
+# Questions de qualification: (numéro, étape, fichier audio, attente) figés à l'import
+_QUESTION_STEPS = tuple(
+    (i, step, f"{step}.wav", _step_wait(step, 12.0))
+    for i, step in enumerate(("q1", "q2", "q3"), 1)
+)
+_IS_LEADS_WAIT = _step_wait("is_leads", 15.0)
+_CONFIRM_WAIT = _step_wait("confirm", 10.0)
+
+# Délais fixes (secondes): un seul endroit pour les ajuster
+_RESPONSE_POLL_INTERVAL = 0.1   # Scrutation des transitions streaming
+_PLAYBACK_WAIT = 0.5            # Placeholder en attendant les events PlaybackFinished
+_TEST_SCENARIO_WAIT = 3         # Écoute du scénario test avant raccroché
+_RECONNECT_DELAY = 5            # Reconnexion WebSocket ARI
+
+# Ensembles constants (test d'appartenance O(1), pas de liste recréée à chaque événement)
+_TRACE_EVENTS = frozenset({'ChannelStateChange', 'PlaybackStarted', 'PlaybackFinished'})
+_POSITIVE_INTENTS = frozenset({"affirm", "interested"})
+
+# Compteur process-wide des playbacks (unicité garantie, sans appel d'horloge)
+_playback_seq = itertools.count(1)
+
+# Pool pour les écritures DB indépendantes du dialogue ARI (recouvrement des I/O)
+_call_db_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="CallDB")
+
+# Pool de préchargement audio (lecture disque recouverte par l'attente de réponse)
+_audio_prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AudioPrefetch")
+_PREFETCH_CHUNK = 64 * 1024
+
+def _warm_sound_file(filename: str):
+    """Lit un fichier son pour le charger dans le cache disque de l'OS (lu ensuite par Asterisk)"""
+    try:
+        with open(os.path.join(config.SOUNDS_PATH, filename), "rb") as f:
+            while f.read(_PREFETCH_CHUNK):
+                pass
+    except OSError as e:
+        logger.debug("⚠️ Audio prefetch failed for %s: %s", filename, e)
 
 # Cache scénarios si disponible
 try:
@@ -139,12 +186,12 @@ class RobotARIStreaming:
                 self.handle_stasis_start(event)
             elif event_type == 'StasisEnd':
                 self.handle_stasis_end(event)
-            elif event_type in ['ChannelStateChange', 'PlaybackStarted', 'PlaybackFinished']:
-                logger.debug(f"📨 {event_type}")
+            elif event_type in _TRACE_EVENTS:
+                logger.debug("📨 %s", event_type)
             elif event_type == 'RecordingStarted':
-                logger.debug(f"🎙️ Recording started")
+                logger.debug("🎙️ Recording started")
             elif event_type == 'RecordingFinished':
-                logger.debug(f"🎙️ Recording finished")
+                logger.debug("🎙️ Recording finished")
 
         except Exception as e:
             logger.error(f"❌ Error handling event: {e}", exc_info=True)
@@ -156,7 +203,7 @@ class RobotARIStreaming:
         logger.warning(f"⚠️ Connection closed: {close_status_code} - {close_msg}")
         if self.running:
             logger.info("🔄 Attempting to reconnect...")
-            time.sleep(5)
+            time.sleep(_RECONNECT_DELAY)
             self.connect()
 
     def handle_stasis_start(self, event):
@@ -207,10 +254,7 @@ class RobotARIStreaming:
                 if channel_id in self.active_calls:
                     del self.active_calls[channel_id]
                 
-                # Traitement post-appel (audio assembly, etc.)
-                if channel_id in self.call_sequences:
-                    self._post_process_call(channel_id)
-                    del self.call_sequences[channel_id]
+                sequence = self.call_sequences.pop(channel_id, None)
                 
                 # Nettoyer ressources streaming
                 if channel_id in self.streaming_sessions:
@@ -218,6 +262,10 @@ class RobotARIStreaming:
                 if channel_id in self.barge_in_active:
                     del self.barge_in_active[channel_id]
             
+            # Traitement post-appel (audio assembly, etc.) hors du verrou des appels
+            if sequence is not None:
+                self._post_process_call(channel_id, sequence)
+            
         except Exception as e:
             logger.error(f"❌ Error in StasisEnd: {e}", exc_info=True)
 
@@ -230,12 +278,15 @@ class RobotARIStreaming:
         logger.info(f"🌊 Starting streaming call handler for {phone_number}")
         
         try:
+            # Créer enregistrement Call en DB (compatibilité existante)
+            # en parallèle de la réponse au canal: I/O DB et HTTP ARI indépendantes
+            call_record_future = _call_db_pool.submit(
+                self._create_call_record, channel_id, phone_number, campaign_id, "streaming"
+            )
+            
             # Répondre au canal
             self.answer_channel(channel_id)
             
-            # Créer enregistrement Call en DB (compatibilité existante)
-            call_record = self._create_call_record(channel_id, phone_number, campaign_id, "streaming")
-            
             # AMD hybride si activé
             final_amd_result = amd_status
             if config.AMD_PYTHON_ENABLED:
@@ -253,6 +304,9 @@ class RobotARIStreaming:
                 logger.info(f"📠 Machine detected for {phone_number} - call handled by dialplan")
                 return
             
+            # Le Call doit exister avant les interactions du scénario
+            call_record_future.result()
+            
             # Initialiser session streaming
             self._init_streaming_session(channel_id, phone_number)
             
@@ -295,11 +349,13 @@ class RobotARIStreaming:
 
     def _init_streaming_session(self, channel_id: str, phone_number: str):
         """Initialise une session streaming pour un appel"""
+        start_time = time.time()
         self.streaming_sessions[channel_id] = {
             "phone_number": phone_number,
-            "start_time": time.time(),
+            "start_time": start_time,
+            # Préfixe des playbackId calculé une fois par appel (pas de time.time() par lecture)
+            "playback_prefix": f"playback-{channel_id}-{int(start_time)}",
             "current_step": "hello",
-            "partial_transcriptions": [],
             "final_transcriptions": [],
             "intents": [],
             "barge_in_count": 0,
@@ -324,28 +380,24 @@ class RobotARIStreaming:
             if event_type == "speech_start":
                 # Détection début de parole - potentiel barge-in
                 if config.BARGE_IN_ENABLED and self.barge_in_active.get(channel_id, False):
-                    logger.debug(f"🔇 Barge-in detected for {channel_id}")
+                    logger.debug("🔇 Barge-in detected for %s", channel_id)
                     self._handle_barge_in(channel_id)
                     session["barge_in_count"] += 1
             
             elif event_type == "speech_end":
                 # Fin de parole
-                logger.debug(f"🤐 Speech end for {channel_id}")
+                logger.debug("🤐 Speech end for %s", channel_id)
                 
             elif event_type == "transcription":
-                # Transcription reçue
-                transcription_data = {
-                    "text": data["text"],
-                    "type": data["type"],
-                    "timestamp": data["timestamp"],
-                    "latency_ms": data["latency_ms"]
-                }
-                
-                if data["type"] == "partial":
-                    session["partial_transcriptions"].append(transcription_data)
-                else:
-                    session["final_transcriptions"].append(transcription_data)
-                    logger.debug(f"📝 Final transcription: '{data['text']}' ({data['latency_ms']:.1f}ms)")
+                # Transcription reçue (les partielles ne sont jamais relues: rien à construire)
+                if data["type"] != "partial":
+                    session["final_transcriptions"].append({
+                        "text": data["text"],
+                        "type": data["type"],
+                        "timestamp": data["timestamp"],
+                        "latency_ms": data["latency_ms"]
+                    })
+                    logger.debug("📝 Final transcription: '%s' (%.1fms)", data["text"], data["latency_ms"])
                     
                     # Analyser intent si transcription finale
                     self._process_final_transcription(channel_id, data["text"])
@@ -377,7 +429,7 @@ class RobotARIStreaming:
             session["intents"].append(intent_data)
             session["latency_stats"].append(metadata.get("latency_ms", 0))
             
-            logger.debug(f"🧠 Intent: {text} → {intent} ({confidence:.2f})")
+            logger.debug("🧠 Intent: %s → %s (%.2f)", text, intent, confidence)
             
             # Déclencher transition scénario
             self._trigger_scenario_transition(channel_id, intent, confidence)
@@ -430,6 +482,14 @@ class RobotARIStreaming:
         except Exception as e:
             logger.error(f"❌ Failed to hangup channel {channel_id}: {e}")
 
+    def prefetch_audio(self, filename):
+        """
+        Précharge en arrière-plan le prochain fichier audio du scénario.
+        Asterisk lit lui-même le fichier: on réchauffe le cache disque pour
+        supprimer la latence de lecture entre deux étapes.
+        """
+        _audio_prefetch_pool.submit(_warm_sound_file, filename)
+
     def play_audio_file(self, channel_id, filename, enable_barge_in=False):
         """
         Joue un fichier audio (méthode hybride)
@@ -443,20 +503,22 @@ class RobotARIStreaming:
             media_uri = f"sound:minibot/{filename}"
             url = f"{ARI_URL}/ari/channels/{channel_id}/play"
             
+            session = self.streaming_sessions.get(channel_id)
+            prefix = session["playback_prefix"] if session is not None else f"playback-{channel_id}"
+            playback_id = f"{prefix}-{next(_playback_seq)}"
+            
             payload = {
                 "media": media_uri,
-                "playbackId": f"playback-{channel_id}-{int(time.time())}"
+                "playbackId": playback_id
             }
             
             response = requests.post(url, auth=self.auth, json=payload)
             response.raise_for_status()
             
-            playback_id = payload["playbackId"]
-            
             # AUTO-TRACKING (garder logique existante)
             self._track_audio(channel_id, "bot", filename)
             
-            logger.debug(f"🔊 Playing {filename} on {channel_id}")
+            logger.debug("🔊 Playing %s on %s", filename, channel_id)
             
             # Attendre fin de playback
             self.wait_for_playback_finished(playback_id)
@@ -494,13 +556,10 @@ class RobotARIStreaming:
         """Attend la fin d'un playback (méthode existante gardée)"""
         # Logique existante simplifiée
         # Dans la vraie implémentation, écouter PlaybackFinished events
-        time.sleep(0.5)  # Placeholder
+        time.sleep(_PLAYBACK_WAIT)  # Placeholder
 
     def _track_audio(self, channel_id, audio_type, filename, transcription="", sentiment=""):
         """AUTO-TRACKING des audio (méthode existante gardée)"""
-        if channel_id not in self.call_sequences:
-            self.call_sequences[channel_id] = []
-        
         audio_item = {
             "type": audio_type,  # "bot" ou "client"
             "file": filename,
@@ -509,41 +568,41 @@ class RobotARIStreaming:
             "timestamp": time.time()
         }
         
-        self.call_sequences[channel_id].append(audio_item)
-        logger.debug(f"📝 Tracked audio: {audio_type}/{filename}")
+        self.call_sequences.setdefault(channel_id, []).append(audio_item)
+        logger.debug("📝 Tracked audio: %s/%s", audio_type, filename)
 
-    def _create_call_record(self, channel_id: str, phone_number: str, campaign_id: str, mode: str) -> Call:
+    def _create_call_record(self, channel_id: str, phone_number: str, campaign_id: str, mode: str) -> bool:
         """Crée un enregistrement Call en DB (compatible existant)"""
         try:
-            db = SessionLocal()
-            call = Call(
-                call_id=channel_id,
-                phone_number=phone_number,
-                campaign_id=campaign_id,
-                status="answered",
-                started_at=datetime.now()
-            )
-            db.add(call)
-            db.commit()
-            db.refresh(call)
-            db.close()
-            
-            logger.debug(f"💾 Call record created: {channel_id}")
-            return call
+            # Horodatage pris avant la transaction
+            started_at = datetime.now()
+            
+            # INSERT Core sur une connexion du pool: pas de Session ORM construite par appel
+            with engine.begin() as conn:
+                conn.execute(
+                    insert(Call).values(
+                        call_id=channel_id,
+                        phone_number=phone_number,
+                        campaign_id=campaign_id,
+                        status="answered",
+                        started_at=started_at
+                    )
+                )
+            
+            logger.debug("💾 Call record created: %s", channel_id)
+            return True
             
         except Exception as e:
             logger.error(f"❌ Failed to create call record: {e}")
-            return None
+            return False
 
-    def _post_process_call(self, channel_id: str):
+    def _post_process_call(self, channel_id: str, sequence: list):
         """Post-traitement après appel (géré par post_call_recording_service)"""
         try:
-            if channel_id in self.call_sequences:
-                sequence = self.call_sequences[channel_id]
-                logger.debug(f"🔧 Post-processing call {channel_id} with {len(sequence)} audio items")
+            logger.debug(f"🔧 Post-processing call {channel_id} with {len(sequence)} audio items")
 
-                # Note: Assembly audio et transcription complets gérés par post_call_recording_service
-                # via MixMonitor recordings
+            # Note: Assembly audio et transcription complets gérés par post_call_recording_service
+            # via MixMonitor recordings
 
         except Exception as e:
             logger.error(f"❌ Error in post-processing: {e}")
@@ -561,16 +620,13 @@ class RobotARIStreaming:
             self.play_audio_file(channel_id, "hello.wav", enable_barge_in=True)
             
             # Attendre transcription et intent
-            response = self._wait_for_streaming_response(channel_id, "hello", timeout=15.0)
+            response = self._wait_for_streaming_response(channel_id, "hello", timeout=_HELLO_WAIT)
             
-            if response["intent"] in ["affirm", "interested"]:
+            if response["intent"] in _POSITIVE_INTENTS:
                 # Continuer avec questions
                 self._ask_streaming_questions(channel_id, phone_number, campaign_id)
-            elif response["intent"] == "deny":
-                # Tentative retry
-                self._try_retry_streaming(channel_id, phone_number, campaign_id)
             else:
-                # Cas par défaut
+                # Refus ou cas incertain: tentative retry
                 self._try_retry_streaming(channel_id, phone_number, campaign_id)
                 
         except Exception as e:
@@ -582,28 +638,32 @@ class RobotARIStreaming:
         
         # Version simplifiée pour tests
         self.play_audio_file(channel_id, "test_audio.wav", enable_barge_in=True)
-        time.sleep(3)  # Attendre un peu
+        time.sleep(_TEST_SCENARIO_WAIT)  # Attendre un peu
         self.hangup_channel(channel_id)
 
     def _wait_for_streaming_response(self, channel_id: str, context: str, timeout: float = 10.0) -> Dict[str, Any]:
         """Attend une réponse en mode streaming"""
-        start_time = time.time()
+        # Références locales pour la boucle de scrutation (évite les lookups globaux/attributs)
+        sessions = self.streaming_sessions
+        now = time.time
+        sleep = time.sleep
+        poll_interval = _RESPONSE_POLL_INTERVAL
+        deadline = now() + timeout
         
-        while time.time() - start_time < timeout:
-            if channel_id in self.streaming_sessions:
-                session = self.streaming_sessions[channel_id]
-                
-                # Vérifier s'il y a une transition en attente
-                if "pending_transition" in session:
-                    transition = session.pop("pending_transition")
-                    return {
-                        "intent": transition["intent"],
-                        "confidence": transition["confidence"],
-                        "text": "",
-                        "timeout": False
-                    }
-            
-            time.sleep(0.1)  # Petit délai
+        while now() < deadline:
+            session = sessions.get(channel_id)
+            
+            # Vérifier s'il y a une transition en attente
+            if session is not None and "pending_transition" in session:
+                transition = session.pop("pending_transition")
+                return {
+                    "intent": transition["intent"],
+                    "confidence": transition["confidence"],
+                    "text": "",
+                    "timeout": False
+                }
+            
+            sleep(poll_interval)  # Petit délai
         
         # Timeout
         logger.warning(f"⏰ Timeout waiting for streaming response on {channel_id}")
@@ -616,72 +676,78 @@ class RobotARIStreaming:
 
     def _ask_streaming_questions(self, channel_id: str, phone_number: str, campaign_id: str):
         """Pose les questions en mode streaming"""
-        questions = ["q1.wav", "q2.wav", "q3.wav"]
-        
-        for i, question in enumerate(questions, 1):
-            logger.debug(f"❓ Question {i} for {phone_number}")
+        for i, step, question, wait in _QUESTION_STEPS:
+            logger.debug("❓ Question %d for %s", i, phone_number)
             
             self.play_audio_file(channel_id, question, enable_barge_in=True)
-            response = self._wait_for_streaming_response(channel_id, f"q{i}", timeout=12.0)
+            response = self._wait_for_streaming_response(channel_id, step, timeout=wait)
             
             # Enregistrer la réponse mais continuer (qualification)
-            logger.debug(f"💬 Q{i} response: {response['intent']} ({response['confidence']:.2f})")
+            logger.debug("💬 Q%d response: %s (%.2f)", i, response["intent"], response["confidence"])
         
         # Question finale
         self._ask_final_offer_streaming(channel_id, phone_number, campaign_id)
 
     def _ask_final_offer_streaming(self, channel_id: str, phone_number: str, campaign_id: str):
         """Question finale en mode streaming"""
-        logger.debug(f"🎯 Final offer for {phone_number}")
+        logger.debug("🎯 Final offer for %s", phone_number)
         
         self.play_audio_file(channel_id, "is_leads.wav", enable_barge_in=True)
-        response = self._wait_for_streaming_response(channel_id, "final_offer", timeout=15.0)
+        response = self._wait_for_streaming_response(channel_id, "final_offer", timeout=_IS_LEADS_WAIT)
         
-        if response["intent"] in ["affirm", "interested"]:
+        # Statut contact écrit en parallèle des derniers messages audio
+        if response["intent"] in _POSITIVE_INTENTS:
             # Lead!
+            _call_db_pool.submit(self._update_contact_status, phone_number, "Leads")
             self._confirm_callback_streaming(channel_id, phone_number, campaign_id)
-            self._update_contact_status(phone_number, "Leads")
         else:
             # Pas intéressé
+            _call_db_pool.submit(self._update_contact_status, phone_number, "Not_interested")
             self.play_audio_file(channel_id, "bye_failed.wav")
-            self._update_contact_status(phone_number, "Not_interested")
         
         self.hangup_channel(channel_id)
 
     def _try_retry_streaming(self, channel_id: str, phone_number: str, campaign_id: str):
         """Tentative de relance en mode streaming"""
-        logger.debug(f"🔄 Retry attempt for {phone_number}")
+        logger.debug("🔄 Retry attempt for %s", phone_number)
         
         self.play_audio_file(channel_id, "retry.wav", enable_barge_in=True)
-        response = self._wait_for_streaming_response(channel_id, "retry", timeout=15.0)
+        response = self._wait_for_streaming_response(channel_id, "retry", timeout=_RETRY_WAIT)
         
-        if response["intent"] in ["affirm", "interested"]:
+        if response["intent"] in _POSITIVE_INTENTS:
             self._ask_streaming_questions(channel_id, phone_number, campaign_id)
         else:
-            self.play_audio_file(channel_id, "bye_failed.wav")
-            self._update_contact_status(phone_number, "Not_interested")
+            # Statut contact écrit en parallèle du message d'au revoir
+            _call_db_pool.submit(self._update_contact_status, phone_number, "Not_interested")
+            
+            # Personne n'a jamais parlé: inutile de jouer le message d'au revoir
+            if self._heard_customer(channel_id):
+                self.play_audio_file(channel_id, "bye_failed.wav")
             self.hangup_channel(channel_id)
 
+    def _heard_customer(self, channel_id: str) -> bool:
+        """Vrai si au moins une transcription finale a été reçue sur l'appel"""
+        session = self.streaming_sessions.get(channel_id)
+        return bool(session and session["final_transcriptions"])
+
     def _confirm_callback_streaming(self, channel_id: str, phone_number: str, campaign_id: str):
         """Confirmation rappel en mode streaming"""
         self.play_audio_file(channel_id, "confirm.wav", enable_barge_in=True)
-        response = self._wait_for_streaming_response(channel_id, "confirm", timeout=10.0)
+        response = self._wait_for_streaming_response(channel_id, "confirm", timeout=_CONFIRM_WAIT)
         
         self.play_audio_file(channel_id, "bye_success.wav")
 
     def _update_contact_status(self, phone_number: str, status: str):
         """Met à jour le statut d'un contact (compatible existant)"""
         try:
-            from models import Contact
-            db = SessionLocal()
-            
-            contact = db.query(Contact).filter(Contact.phone == phone_number).first()
-            if contact:
-                contact.status = status
-                db.commit()
-                logger.debug(f"📊 Contact {phone_number} → {status}")
+            # UPDATE direct: pas de SELECT + hydratation ORM avant l'écriture
+            with engine.begin() as conn:
+                result = conn.execute(
+                    update(Contact).where(Contact.phone == phone_number).values(status=status)
+                )
             
-            db.close()
+            if result.rowcount:
+                logger.debug("📊 Contact %s → %s", phone_number, status)
             
         except Exception as e:
             logger.error(f"❌ Failed to update contact status: {e}")
@@ -695,7 +761,7 @@ class RobotARIStreaming:
         return {
             "mode": "streaming",
             "active_calls": len(self.active_calls),
-            "streaming_sessions": len(self.streaming_sessions) if hasattr(self, 'streaming_sessions') else 0,
+            "streaming_sessions": len(self.streaming_sessions),
             "services_available": {
                 "streaming": STREAMING_SERVICES_AVAILABLE,
                 "scenarios": SCENARIOS_AVAILABLE
@@ -717,6 +783,8 @@ class RobotARIStreaming:
         self.running = False
         if self.ws:
             self.ws.close()
+        _call_db_pool.shutdown(wait=True)
+        _audio_prefetch_pool.shutdown(wait=False)
 
 # Instance globale
 robot = RobotARIStreaming()
@@ -7,7 +7,7 @@ import os
 import json
 import importlib.util
 from pathlib import Path
-from logger_config import get_logger
+from logger_config import get_logger, log_banner
 
 logger = get_logger(__name__)
 
@@ -15,19 +15,22 @@ class ScenarioManager:
     """Gère le pré-chargement et la validation des scénarios avec TTS"""
 
     def __init__(self):
-        self.scenarios_loaded = {}
         self.tts_embeddings_cache = {}
         self.scenario_configs = {}
         self.audio_dependencies = {
             "production": ["hello.wav", "retry.wav", "q1.wav", "q2.wav", "q3.wav", "is_leads.wav", "confirm.wav", "bye_success.wav", "bye_failed.wav"],
             "test": ["test_audio.wav"]
         }
+        
+        # Scénario actif (initialisé ici pour des lookups directs sans getattr)
+        self.active_scenario = None
+        self.scenario_name = None
+        self.tts_config = {}
+        self.voice_embedding = None
 
     def preload_single_scenario(self):
         """Pré-charge LE scénario unique (optimisé pour un seul scénario)"""
-        logger.info("=" * 60)
-        logger.info("🎭 PRÉ-CHARGEMENT SCÉNARIO UNIQUE")
-        logger.info("=" * 60)
+        log_banner(logger, "🎭 PRÉ-CHARGEMENT SCÉNARIO UNIQUE")
 
         try:
             # 1. Auto-détection du scénario actif (priorité : généré > streaming > fallback)
@@ -40,7 +43,7 @@ class ScenarioManager:
             # 2. Chargement en mémoire (UN SEUL)
             self.active_scenario = active_scenario_func
             self.scenario_name = scenario_name
-            self.tts_config = tts_config
+            self.tts_config = tts_config or {}
             
             # 3. Préchargement TTS embeddings si disponibles
             self._preload_tts_embeddings()
@@ -168,26 +171,26 @@ class ScenarioManager:
 
     def get_scenario_name(self):
         """Retourne le nom du scénario actif (lookup instantané)"""
-        return getattr(self, 'scenario_name', 'unknown')
+        return self.scenario_name or 'unknown'
 
     def get_tts_config(self):
         """Retourne la config TTS (lookup instantané)"""
-        return getattr(self, 'tts_config', {})
+        return self.tts_config
 
     def get_voice_embedding(self):
         """Retourne l'embedding voix préchargé (lookup instantané)"""
-        return getattr(self, 'voice_embedding', None)
+        return self.voice_embedding
 
     def is_ready(self):
         """Vérifie si le cache est prêt (lookup instantané)"""
-        return hasattr(self, 'active_scenario') and self.active_scenario is not None
+        return self.active_scenario is not None
 
     def get_cache_info(self):
         """Retourne les infos du cache pour debug (lookup instantané)"""
         return {
-            'scenario_name': getattr(self, 'scenario_name', None),
-            'has_tts_config': bool(getattr(self, 'tts_config', {})),
-            'has_voice_embedding': getattr(self, 'voice_embedding', None) is not None,
+            'scenario_name': self.scenario_name,
+            'has_tts_config': bool(self.tts_config),
+            'has_voice_embedding': self.voice_embedding is not None,
             'is_ready': self.is_ready()
         }
 
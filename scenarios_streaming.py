@@ -6,13 +6,18 @@ Compatible avec l'architecture existante
 """
 
 from datetime import datetime
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from database import SessionLocal
+from database import engine
 from models import Call, CallInteraction, Contact
 from logger_config import get_logger
 import time
 import os
+import queue
+import atexit
 import asyncio
+import threading
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, Tuple
 
 logger = get_logger(__name__)
@@ -104,6 +109,74 @@ STREAMING_CONFIG = {
     }
 }
 
+# Temps d'attente max par étape, aplatis et normalisés en float à l'import
+STEP_MAX_WAIT = {
+    step: float(step_config["max_wait_seconds"])
+    for step, step_config in STREAMING_CONFIG.items()
+}
+
+# Paramètres d'étape pré-résolus à l'import: étape → (barge_in_enabled, max_wait)
+_DEFAULT_STEP_PARAMS = (False, 10.0)
+_STEP_PARAMS: Dict[str, Tuple[bool, float]] = {
+    step: (step_config.get("barge_in_enabled", False), STEP_MAX_WAIT[step])
+    for step, step_config in STREAMING_CONFIG.items()
+}
+
+# Attente adaptative: ajustée selon la confiance de l'étape précédente, bornée
+_WAIT_MIN_SECONDS = 5.0
+_WAIT_MAX_SECONDS = 18.0
+_CONFIDENT_THRESHOLD = 0.9
+_UNSURE_THRESHOLD = 0.3
+
+def _adaptive_wait(max_wait: float, prev_confidence: Optional[float]) -> float:
+    """Raccourcit l'attente après une réponse franche, l'allonge après une réponse incertaine"""
+    if prev_confidence is None:
+        return max_wait
+    if prev_confidence > _CONFIDENT_THRESHOLD:
+        max_wait *= 0.5
+    elif prev_confidence < _UNSURE_THRESHOLD:
+        max_wait *= 1.2
+    return min(max(max_wait, _WAIT_MIN_SECONDS), _WAIT_MAX_SECONDS)
+
+# Résultat d'une étape de scénario (enregistrement compact, sans table de hachage par étape)
+@dataclass(slots=True)
+class StepResult:
+    step: str
+    audio_file: str
+    intent: str
+    confidence: float
+    text: str
+    barge_in_used: bool = False
+    elapsed_time: float = 0.0
+    success: bool = True
+    error: Optional[str] = None
+    interaction: Optional[Dict[str, Any]] = None
+
+# Classes d'intents (appartenance O(1), pas de liste recréée à chaque décision)
+_POSITIVE_INTENTS = frozenset({"affirm", "interested"})
+_NEGATIVE_INTENTS = frozenset({"deny", "not_interested"})
+
+# Numéro de question par étape (CallInteraction.question_number)
+_QUESTION_NUMBER = {
+    "hello": 1,
+    "retry": 2,
+    "q1": 3,
+    "q2": 4,
+    "q3": 5,
+    "is_leads": 6,
+    "confirm": 7
+}
+
+# Questions de qualification (étape, fichier audio), table statique parcourue à chaque appel
+_QUESTION_STEPS = (
+    ("q1", "q1.wav"),
+    ("q2", "q2.wav"),
+    ("q3", "q3.wav")
+)
+
+# Audio suivant de chaque question (préchargé pendant l'attente de réponse)
+_QUESTION_NEXT_AUDIO = tuple(audio for _, audio in _QUESTION_STEPS[1:]) + ("is_leads.wav",)
+
 # ============================================================================
 # SCÉNARIOS HYBRIDES - COMPATIBLE STREAMING ET CLASSIC
 # ============================================================================
@@ -114,6 +187,15 @@ class ScenarioManager:
     def __init__(self):
         self.logger = get_logger(f"{__name__}.ScenarioManager")
         
+        # Écritures DB de fin d'appel déportées dans un thread dédié
+        _start_finalize_writer()
+        
+        # Table de dispatch des scénarios (nom → méthode)
+        self._scenarios = {
+            "production": self._scenario_production_streaming,
+            "test": self._scenario_test_streaming
+        }
+        
     def execute_scenario(self, robot, channel_id: str, phone_number: str, campaign_id: str, 
                         scenario_name: str = "production"):
         """
@@ -126,25 +208,40 @@ class ScenarioManager:
             campaign_id: ID de campagne
             scenario_name: "production" ou "test"
         """
+        return self._run_handler(
+            self._scenarios.get(scenario_name), scenario_name, robot, channel_id, phone_number, campaign_id
+        )
+    
+    def bind_scenario(self, scenario_name: str):
+        """
+        Retourne une fonction liée directement à la méthode du scénario
+        (même contrôles et gestion d'erreur qu'execute_scenario, sans re-dispatch par nom)
+        """
+        handler = self._scenarios[scenario_name]
+        
+        def run_scenario(robot, channel_id: str, phone_number: str, campaign_id: str):
+            return self._run_handler(handler, scenario_name, robot, channel_id, phone_number, campaign_id)
+        
+        run_scenario.__name__ = f"scenario_{scenario_name}_streaming"
+        return run_scenario
+    
+    def _run_handler(self, handler, scenario_name: str, robot, channel_id: str, phone_number: str, campaign_id: str):
+        """Contrôles, log de démarrage et gestion d'erreur communs à tous les points d'entrée"""
         if not STREAMING_SERVICES_AVAILABLE:
             raise RuntimeError("Streaming services required but not available")
         
         self.logger.info(f"🎬 Starting scenario '{scenario_name}' in streaming mode for {phone_number}")
         
+        if handler is None:
+            self.logger.error(f"❌ Unknown scenario: {scenario_name}")
+            return False
+        
         try:
-            if scenario_name == "production":
-                return self._scenario_production_streaming(robot, channel_id, phone_number, campaign_id)
-            elif scenario_name == "test":
-                return self._scenario_test_streaming(robot, channel_id, phone_number, campaign_id)
-            else:
-                self.logger.error(f"❌ Unknown scenario: {scenario_name}")
-                return False
-                
+            return handler(robot, channel_id, phone_number, campaign_id)
         except Exception as e:
             self.logger.error(f"❌ Error in scenario {scenario_name}: {e}", exc_info=True)
             return False
     
-    
     # ========================================================================
     # SCÉNARIOS STREAMING (nouveaux)
     # ========================================================================
@@ -153,10 +250,10 @@ class ScenarioManager:
         """Scénario production en mode streaming avec barge-in et intent"""
         self.logger.info(f"🌊 Production scenario streaming for {phone_number}")
         
+        # Initialiser tracking
+        conversation_flow = []
+        
         try:
-            # Initialiser tracking
-            conversation_flow = []
-            
             # Étape 1: Introduction
             step_result = self._execute_streaming_step(
                 robot, channel_id, "hello", "hello.wav", phone_number
@@ -164,12 +261,13 @@ class ScenarioManager:
             conversation_flow.append(step_result)
             
             # Décision basée sur intent
-            if step_result["intent"] in ["affirm", "interested"]:
+            intent = step_result.intent
+            if intent in _POSITIVE_INTENTS:
                 # Client intéressé - continuer avec questions
                 return self._continue_with_questions_streaming(
                     robot, channel_id, phone_number, campaign_id, conversation_flow
                 )
-            elif step_result["intent"] in ["deny", "not_interested"]:
+            elif intent in _NEGATIVE_INTENTS:
                 # Client pas intéressé - tenter retry
                 return self._try_retry_streaming(
                     robot, channel_id, phone_number, campaign_id, conversation_flow
@@ -183,17 +281,21 @@ class ScenarioManager:
         except Exception as e:
             self.logger.error(f"❌ Error in production streaming scenario: {e}")
             return False
+        
+        finally:
+            # Interactions restantes si le scénario s'est interrompu avant sa conclusion
+            self._finalize_call(channel_id, phone_number, None, conversation_flow)
     
     def _execute_streaming_step(self, robot, channel_id: str, step_name: str, 
-                               audio_file: str, phone_number: str) -> Dict[str, Any]:
+                               audio_file: str, phone_number: str,
+                               prev_confidence: Optional[float] = None) -> StepResult:
         """Exécute une étape de scénario en mode streaming"""
-        step_config = STREAMING_CONFIG.get(step_name, {})
-        barge_in_enabled = step_config.get("barge_in_enabled", False)
-        max_wait = step_config.get("max_wait_seconds", 10.0)
+        barge_in_enabled, max_wait = _STEP_PARAMS.get(step_name, _DEFAULT_STEP_PARAMS)
+        max_wait = _adaptive_wait(max_wait, prev_confidence)
         
-        self.logger.debug(f"🎯 Step {step_name}: {audio_file} (barge-in: {barge_in_enabled})")
-        
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
+        # Horodatage unique de l'étape (début de lecture), réutilisé pour l'interaction
+        played_at = datetime.now()
         
         try:
             # Jouer audio avec barge-in
@@ -202,54 +304,47 @@ class ScenarioManager:
             # Attendre réponse streaming
             response = robot._wait_for_streaming_response(channel_id, step_name, max_wait)
             
-            # Enregistrer interaction
-            self._save_interaction(channel_id, step_name, audio_file, response)
+            # Interaction bufferisée, sauvegardée en fin de scénario
+            interaction = self._build_interaction(channel_id, step_name, audio_file, response, played_at)
             
-            elapsed_time = time.time() - start_time
+            elapsed_time = (time.monotonic_ns() - start_ns) / 1e9
             
-            return {
-                "step": step_name,
-                "audio_file": audio_file,
-                "intent": response.get("intent", "unsure"),
-                "confidence": response.get("confidence", 0.0),
-                "text": response.get("text", ""),
-                "barge_in_used": response.get("barge_in_used", False),
-                "elapsed_time": elapsed_time,
-                "success": True
-            }
+            return StepResult(
+                step=step_name,
+                audio_file=audio_file,
+                intent=response.get("intent", "unsure"),
+                confidence=response.get("confidence", 0.0),
+                text=response.get("text", ""),
+                barge_in_used=response.get("barge_in_used", False),
+                elapsed_time=elapsed_time,
+                interaction=interaction
+            )
             
         except Exception as e:
             self.logger.error(f"❌ Error in streaming step {step_name}: {e}")
-            return {
-                "step": step_name,
-                "audio_file": audio_file,
-                "intent": "error",
-                "confidence": 0.0,
-                "text": "",
-                "error": str(e),
-                "success": False
-            }
+            return StepResult(
+                step=step_name,
+                audio_file=audio_file,
+                intent="error",
+                confidence=0.0,
+                text="",
+                success=False,
+                error=str(e)
+            )
     
     def _continue_with_questions_streaming(self, robot, channel_id: str, phone_number: str, 
                                          campaign_id: str, conversation_flow: list) -> bool:
         """Continue avec les questions de qualification en streaming"""
-        self.logger.debug(f"❓ Qualification questions for {phone_number}")
-        
-        questions = [
-            ("q1", "q1.wav"),
-            ("q2", "q2.wav"), 
-            ("q3", "q3.wav")
-        ]
+        self.logger.debug("❓ Qualification questions for %s", phone_number)
         
         # Poser toutes les questions
-        for step_name, audio_file in questions:
+        for (step_name, audio_file), next_audio in zip(_QUESTION_STEPS, _QUESTION_NEXT_AUDIO):
+            robot.prefetch_audio(next_audio)
             step_result = self._execute_streaming_step(
-                robot, channel_id, step_name, audio_file, phone_number
+                robot, channel_id, step_name, audio_file, phone_number, conversation_flow[-1].confidence
             )
-            conversation_flow.append(step_result)
-            
             # En mode qualification, on continue même si réponse négative
-            self.logger.debug(f"💬 {step_name} response: {step_result['intent']} ({step_result['confidence']:.2f})")
+            conversation_flow.append(step_result)
         
         # Question finale de leads
         return self._ask_final_leads_streaming(robot, channel_id, phone_number, campaign_id, conversation_flow)
@@ -257,59 +352,53 @@ class ScenarioManager:
     def _ask_final_leads_streaming(self, robot, channel_id: str, phone_number: str,
                                  campaign_id: str, conversation_flow: list) -> bool:
         """Question finale pour déterminer si c'est un lead"""
-        self.logger.debug(f"🎯 Final leads question for {phone_number}")
+        self.logger.debug("🎯 Final leads question for %s", phone_number)
         
         step_result = self._execute_streaming_step(
-            robot, channel_id, "is_leads", "is_leads.wav", phone_number
+            robot, channel_id, "is_leads", "is_leads.wav", phone_number, conversation_flow[-1].confidence
         )
         conversation_flow.append(step_result)
         
-        if step_result["intent"] in ["affirm", "interested"]:
+        if step_result.intent in _POSITIVE_INTENTS:
             # C'est un lead !
             self.logger.info(f"✅ LEAD detected: {phone_number}")
             
             # Demander confirmation/créneau
             confirm_result = self._execute_streaming_step(
-                robot, channel_id, "confirm", "confirm.wav", phone_number
+                robot, channel_id, "confirm", "confirm.wav", phone_number, step_result.confidence
             )
             conversation_flow.append(confirm_result)
             
             # Message de succès
-            robot.play_audio_file(channel_id, "bye_success.wav")
-            
-            # Mettre à jour statut
-            self._update_contact_status(phone_number, "Leads", conversation_flow)
+            self._conclude_call(robot, channel_id, phone_number, "Leads", conversation_flow, "bye_success.wav")
             return True
             
         else:
             # Pas intéressé
             self.logger.info(f"❌ Not interested: {phone_number}")
             
-            robot.play_audio_file(channel_id, "bye_failed.wav")
-            
-            self._update_contact_status(phone_number, "Not_interested", conversation_flow)
+            self._conclude_call(robot, channel_id, phone_number, "Not_interested", conversation_flow, "bye_failed.wav")
             return False
     
     def _try_retry_streaming(self, robot, channel_id: str, phone_number: str,
                            campaign_id: str, conversation_flow: list) -> bool:
         """Tentative de relance en mode streaming"""
-        self.logger.debug(f"🔄 Retry attempt for {phone_number}")
+        self.logger.debug("🔄 Retry attempt for %s", phone_number)
         
         step_result = self._execute_streaming_step(
-            robot, channel_id, "retry", "retry.wav", phone_number
+            robot, channel_id, "retry", "retry.wav", phone_number, conversation_flow[-1].confidence
         )
         conversation_flow.append(step_result)
         
-        if step_result["intent"] in ["affirm", "interested"]:
+        if step_result.intent in _POSITIVE_INTENTS:
             # Client accepte après retry
             return self._continue_with_questions_streaming(
                 robot, channel_id, phone_number, campaign_id, conversation_flow
             )
         else:
-            # Client refuse définitivement
-            robot.play_audio_file(channel_id, "bye_failed.wav")
-            
-            self._update_contact_status(phone_number, "Not_interested", conversation_flow)
+            # Client refuse définitivement (pas d'au revoir si personne n'a jamais parlé)
+            bye_audio = "bye_failed.wav" if robot._heard_customer(channel_id) else None
+            self._conclude_call(robot, channel_id, phone_number, "Not_interested", conversation_flow, bye_audio)
             return False
     
     def _scenario_test_streaming(self, robot, channel_id: str, phone_number: str, campaign_id: str) -> bool:
@@ -320,8 +409,9 @@ class ScenarioManager:
             step_result = self._execute_streaming_step(
                 robot, channel_id, "test", "test_audio.wav", phone_number
             )
+            self._finalize_call(channel_id, phone_number, None, [step_result])
             
-            self.logger.info(f"🧪 Test result: {step_result['intent']} ({step_result['confidence']:.2f})")
+            self.logger.info(f"🧪 Test result: {step_result.intent} ({step_result.confidence:.2f})")
             return True
             
         except Exception as e:
@@ -334,63 +424,140 @@ class ScenarioManager:
     # ========================================================================
     
     
-    def _save_interaction(self, channel_id: str, step_name: str, audio_file: str, response: Dict[str, Any]):
-        """Sauvegarde une interaction en base de données"""
-        try:
-            db = SessionLocal()
-            
-            interaction = CallInteraction(
-                call_id=channel_id,
-                question_number=self._get_question_number(step_name),
-                question_played=audio_file,
-                transcription=response.get("text", ""),
-                sentiment=response.get("intent", "unsure"),
-                confidence=response.get("confidence", 0.0),
-                played_at=datetime.now()
-            )
-            
-            db.add(interaction)
-            db.commit()
-            db.close()
-            
-            self.logger.debug(f"💾 Interaction saved: {step_name}")
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to save interaction: {e}")
+    def _build_interaction(self, channel_id: str, step_name: str, audio_file: str, response: Dict[str, Any],
+                           played_at: datetime) -> Dict[str, Any]:
+        """Prépare une interaction (mapping CallInteraction) pour l'écriture groupée"""
+        return {
+            "call_id": channel_id,
+            "question_number": self._get_question_number(step_name),
+            "question_played": audio_file,
+            "transcription": response.get("text", ""),
+            "sentiment": response.get("intent", "unsure"),
+            "confidence": response.get("confidence", 0.0),
+            "played_at": played_at
+        }
     
     def _get_question_number(self, step_name: str) -> int:
         """Convertit le nom d'étape en numéro de question"""
-        mapping = {
-            "hello": 1,
-            "retry": 2,
-            "q1": 3,
-            "q2": 4,
-            "q3": 5,
-            "is_leads": 6,
-            "confirm": 7
-        }
-        return mapping.get(step_name, 0)
+        return _QUESTION_NUMBER.get(step_name, 0)
+    
+    def _conclude_call(self, robot, channel_id: str, phone_number: str, status: str,
+                       conversation_flow: list, bye_audio: Optional[str] = None):
+        """Planifie la finalisation DB avant le message de fin: écriture et audio en parallèle"""
+        self._finalize_call(channel_id, phone_number, status, conversation_flow)
+        
+        # Un seul log récapitulatif par appel (au lieu d'un log par étape)
+        self.logger.info(
+            "📋 Scenario complete for %s → %s: %s", phone_number, status,
+            " ".join(f"{step.step}={step.intent}({step.confidence:.2f})" for step in conversation_flow)
+        )
+        
+        # Flow remis au thread d'écriture: plus rien à écrire en fin de scénario
+        conversation_flow.clear()
+        
+        if bye_audio:
+            robot.play_audio_file(channel_id, bye_audio)
     
-    def _update_contact_status(self, phone_number: str, status: str, conversation_flow: list = None):
-        """Met à jour le statut d'un contact"""
+    def _finalize_call(self, channel_id: str, phone_number: str, status: Optional[str], conversation_flow: list):
+        """
+        Planifie l'écriture des interactions du scénario et du statut
+        du contact (thread d'écriture, hors du chemin de l'appel)
+        """
+        interactions = [step.interaction for step in conversation_flow if step.interaction]
+        if not interactions and status is None:
+            return
+        
+        # Heure de fin d'appel (locale, comme batch_caller), pas celle de l'écriture du lot
+        _FINALIZE_QUEUE.put((channel_id, phone_number, status, interactions, datetime.now()))
+
+# ============================================================================
+# ÉCRITURE DB GROUPÉE (thread dédié)
+# ============================================================================
+
+# Finalisations d'appels en attente: (channel_id, phone_number, status, interactions, ended_at)
+_FINALIZE_QUEUE = queue.Queue()
+_WRITER_BATCH_SIZE = 64       # Finalisations max par transaction
+_WRITER_BATCH_WAIT = 0.2      # Secondes d'attente max pour compléter un lot
+_writer_lock = threading.Lock()
+_writer_thread = None
+
+def _start_finalize_writer():
+    """Démarre (une seule fois) le thread d'écriture des finalisations"""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(
+                target=_finalize_writer, daemon=True, name="ScenarioDBWriter"
+            )
+            _writer_thread.start()
+            atexit.register(_FINALIZE_QUEUE.join)
+
+def _finalize_writer():
+    """Regroupe les finalisations en file: une transaction par lot"""
+    while True:
+        batch = [_FINALIZE_QUEUE.get()]
+        deadline = time.monotonic() + _WRITER_BATCH_WAIT
+        
+        while len(batch) < _WRITER_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_FINALIZE_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
         try:
-            db = SessionLocal()
-            
-            contact = db.query(Contact).filter(Contact.phone == phone_number).first()
-            if contact:
-                contact.status = status
-                contact.last_attempt = datetime.now()
-                contact.attempts += 1
+            _write_finalizations(batch)
+        finally:
+            for _ in batch:
+                _FINALIZE_QUEUE.task_done()
 
-                # Note: Conversation flow sauvegardé via MixMonitor (post_call_recording_service)
+def _write_finalizations(batch: list):
+    """Écrit un lot de finalisations en une transaction, un savepoint par appel"""
+    try:
+        saved = 0
+        updated = []
+        
+        with engine.begin() as conn:
+            for channel_id, phone_number, status, interactions, ended_at in batch:
+                # Savepoint par appel: une ligne en erreur n'annule pas les autres appels du lot
+                try:
+                    with conn.begin_nested():
+                        if interactions:
+                            conn.execute(insert(CallInteraction), interactions)
+                        
+                        if status is None:
+                            saved += len(interactions)
+                            continue
+                        
+                        result = conn.execute(
+                            update(Contact)
+                            .where(Contact.phone == phone_number)
+                            .values(
+                                status=status,
+                                last_attempt=ended_at,
+                                attempts=Contact.attempts + 1
+                            )
+                        )
+                    
+                    saved += len(interactions)
+                    if result.rowcount:
+                        updated.append((phone_number, status))
+                
+                except Exception as e:
+                    logger.error(f"❌ Failed to finalize call {channel_id} ({phone_number}): {e}")
 
-                db.commit()
-                self.logger.info(f"📊 Contact {phone_number} → {status}")
-            
-            db.close()
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to update contact status: {e}")
+        # Note: Conversation complète sauvegardée via MixMonitor (post_call_recording_service)
+
+        if saved:
+            logger.debug("💾 %d interactions saved (%d calls)", saved, len(batch))
+        for phone_number, status in updated:
+            logger.info(f"📊 Contact {phone_number} → {status}")
+        
+    except Exception as e:
+        phones = ", ".join(item[1] for item in batch)
+        logger.error(f"❌ Failed to finalize calls ({phones}): {e}")
 
 # ============================================================================
 # INSTANCES GLOBALES ET FONCTIONS DE COMPATIBILITÉ
@@ -399,31 +566,13 @@ class ScenarioManager:
 # Instance globale du gestionnaire
 scenario_manager = ScenarioManager()
 
-# Fonctions de compatibilité avec l'existant
-def scenario_production(robot, channel_id: str, phone_number: str, campaign_id: str):
-    """Fonction de compatibilité pour scenario_production existant"""
-    return scenario_manager.execute_scenario(
-        robot, channel_id, phone_number, campaign_id, "production"
-    )
-
-def scenario_test(robot, channel_id: str, phone_number: str, campaign_id: str):
-    """Fonction de compatibilité pour scenario_test existant"""
-    return scenario_manager.execute_scenario(
-        robot, channel_id, phone_number, campaign_id, "test"
-    )
+# Fonctions de compatibilité avec l'existant (liées directement aux méthodes)
+scenario_production = scenario_manager.bind_scenario("production")
+scenario_test = scenario_manager.bind_scenario("test")
 
 # Nouvelles fonctions spécifiques
-def scenario_production_streaming(robot, channel_id: str, phone_number: str, campaign_id: str):
-    """Scénario production en mode streaming"""
-    return scenario_manager.execute_scenario(
-        robot, channel_id, phone_number, campaign_id, "production"
-    )
-
-def scenario_test_streaming(robot, channel_id: str, phone_number: str, campaign_id: str):
-    """Scénario test en mode streaming"""
-    return scenario_manager.execute_scenario(
-        robot, channel_id, phone_number, campaign_id, "test"
-    )
+scenario_production_streaming = scenario_production
+scenario_test_streaming = scenario_test
 
 if __name__ == "__main__":
     # Test des scénarios
@@ -9,9 +9,11 @@ import numpy as np
 import json
 import time
 import re
+import threading
 from typing import Dict, Optional, Tuple, List, Any
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 
 # Ajouter le répertoire parent au PYTHONPATH pour les imports
 import sys
@@ -35,6 +37,14 @@ except ImportError as e:
     VAD_AVAILABLE = False
     logger.warning(f"⚠️ WebRTC VAD not available: {e}. Python AMD will be limited.")
 
+# FFT scipy (pocketfft multi-thread) si disponible, sinon numpy
+try:
+    from scipy import fft as _fft
+    _FFT_KWARGS = {"workers": max(1, config.AMD_FFT_WORKERS)}
+except ImportError:
+    _fft = np.fft
+    _FFT_KWARGS = {}
+
 # Import Vosk pour détection keywords si disponible
 try:
     from vosk import Model, KaldiRecognizer
@@ -42,6 +52,59 @@ try:
 except ImportError:
     VOSK_AVAILABLE = False
 
+# Mots-clés indicateurs de répondeur (tuple figé, déjà en minuscules et internés)
+VM_KEYWORDS = tuple(sys.intern(keyword.lower()) for keyword in (
+    "laissez un message", "laissez votre message", "après le bip", 
+    "après le signal", "bip sonore", "enregistrer votre message",
+    "nous rappeler", "nous recontacter", "indisponible", 
+    "absents", "absent", "messagerie", "répondeur",
+    "pas disponible", "pas là", "joignable",
+    "ne suis pas", "ne peut pas", "n'est pas là"
+))
+
+# Alternation compilée une seule fois: pré-filtre en un seul parcours du texte (moteur C de re)
+_VM_KEYWORDS_RE = re.compile("|".join(map(re.escape, VM_KEYWORDS)))
+
+# Longueur du plus court mot-clé: en dessous, aucune correspondance possible
+_VM_MIN_KEYWORD_LEN = min(len(keyword) for keyword in VM_KEYWORDS)
+
+# Seuils de décision lus une seule fois depuis la config (pas de lookup d'attribut par analyse)
+_MACHINE_SPEECH_THRESHOLD = config.AMD_MACHINE_SPEECH_THRESHOLD
+_HUMAN_SPEECH_THRESHOLD = config.AMD_HUMAN_SPEECH_THRESHOLD
+
+# Frames minimales avant arrêt anticipé sur mot-clé (500 ms, évite les artefacts de début)
+_MIN_FRAMES_BEFORE_EXIT = 25
+
+def _scan_speech_segments(is_speech: np.ndarray, frame_duration_s: float) -> Tuple[float, float, float, List[float]]:
+    """
+    Segmentation parole/silence vectorisée (run-length sur les décisions VAD)
+    
+    Returns:
+        Tuple[total_speech, total_silence, longest_segment, segments]
+        (mêmes valeurs que l'accumulateur frame par frame: segments clos
+        recomptés dans total_speech, silence compté jusqu'au dernier segment)
+    """
+    if not is_speech.any():
+        return 0.0, 0.0, 0.0, []
+    
+    # Fronts montants/descendants: débuts et fins (exclues) des segments de parole
+    edges = np.diff(np.concatenate(([0], is_speech, [0])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    
+    speech_frames = int(lengths.sum())
+    closed_frames = speech_frames - int(lengths[-1]) if ends[-1] == len(is_speech) else speech_frames
+    silence_frames = int(starts[-1]) - (speech_frames - int(lengths[-1]))
+    
+    segments = lengths * frame_duration_s
+    return (
+        (speech_frames + closed_frames) * frame_duration_s,
+        silence_frames * frame_duration_s,
+        float(segments.max()),
+        segments.tolist()
+    )
+
 class AMDResult(Enum):
     """Résultats possibles de l'AMD"""
     HUMAN = "HUMAN"
@@ -49,6 +112,20 @@ class AMDResult(Enum):
     NOTSURE = "NOTSURE"
     ERROR = "ERROR"
 
+# Compteur de stats par résultat (ERROR et cas non classés comptés comme incertains)
+_RESULT_COUNTERS = {
+    AMDResult.HUMAN: "human_detected",
+    AMDResult.MACHINE: "machine_detected",
+    AMDResult.NOTSURE: "uncertain_cases"
+}
+
+# Statuts AMD Asterisk → (résultat, confiance, compteur de stats)
+_ASTERISK_MAP = {
+    "HUMAN": (AMDResult.HUMAN, 0.8, "human_detected"),
+    "MACHINE": (AMDResult.MACHINE, 0.9, "machine_detected"),
+    "NOTSURE": (AMDResult.NOTSURE, 0.5, "uncertain_cases")
+}
+
 class AMDService:
     """
     Service AMD hybride pour MiniBotPanel v2
@@ -65,25 +142,19 @@ class AMDService:
             self.sample_rate = 16000
             self.frame_duration_ms = 20  # 20ms frames pour AMD
             self.frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
+            
+            # Bandes spectrales du beep précalculées une fois (taille de frame fixe)
+            freqs = np.fft.rfftfreq(self.frame_size, 1 / self.sample_rate)
+            self._beep_mask = (freqs >= 800) & (freqs <= 2000)
+            self._other_mask = freqs < 800
         
-        # Modèle Vosk pour keyword detection (optionnel)
+        # Modèle Vosk pour keyword detection (optionnel), chargé au premier usage
         self.vosk_model = None
-        if VOSK_AVAILABLE and hasattr(config, 'VOSK_MODEL_PATH'):
-            try:
-                self.vosk_model = Model(config.VOSK_MODEL_PATH)
-                logger.info("✅ Vosk model loaded for AMD keyword detection")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to load Vosk for AMD: {e}")
+        self._vosk_loaded = False
+        self._vosk_lock = threading.Lock()
         
         # Mots-clés indicateurs de répondeur
-        self.vm_keywords = [
-            "laissez un message", "laissez votre message", "après le bip", 
-            "après le signal", "bip sonore", "enregistrer votre message",
-            "nous rappeler", "nous recontacter", "indisponible", 
-            "absents", "absent", "messagerie", "répondeur",
-            "pas disponible", "pas là", "joignable",
-            "ne suis pas", "ne peut pas", "n'est pas là"
-        ]
+        self.vm_keywords = VM_KEYWORDS
         
         # Statistiques
         self.stats = {
@@ -97,6 +168,8 @@ class AMDService:
             "beep_detections": 0,
             "keyword_detections": 0
         }
+        # Mises à jour groupées: une prise de verrou par analyse (appels concurrents)
+        self._stats_lock = threading.Lock()
 
     def analyze_asterisk_amd(self, amd_status: str, amd_cause: str = "") -> Tuple[AMDResult, float, Dict[str, Any]]:
         """
@@ -109,9 +182,6 @@ class AMDService:
         Returns:
             Tuple[result, confidence, metadata]
         """
-        self.stats["total_analyses"] += 1
-        self.stats["asterisk_decisions"] += 1
-        
         metadata = {
             "method": "asterisk_amd",
             "amd_status": amd_status,
@@ -119,20 +189,14 @@ class AMDService:
             "timestamp": time.time()
         }
         
-        if amd_status == "HUMAN":
-            self.stats["human_detected"] += 1
-            return AMDResult.HUMAN, 0.8, metadata
-            
-        elif amd_status == "MACHINE":
-            self.stats["machine_detected"] += 1
-            return AMDResult.MACHINE, 0.9, metadata
-            
-        elif amd_status == "NOTSURE":
-            self.stats["uncertain_cases"] += 1
-            return AMDResult.NOTSURE, 0.5, metadata
-            
-        else:
+        entry = _ASTERISK_MAP.get(amd_status)
+        if entry is None:
+            self._record_stats(("total_analyses", "asterisk_decisions"))
             return AMDResult.ERROR, 0.0, {**metadata, "error": f"Unknown AMD status: {amd_status}"}
+        
+        result, confidence, counter = entry
+        self._record_stats(("total_analyses", "asterisk_decisions", counter))
+        return result, confidence, metadata
 
     def analyze_audio_stream(self, audio_frames: List[bytes], max_analysis_time: float = 7.0) -> Tuple[AMDResult, float, Dict[str, Any]]:
         """
@@ -149,97 +213,89 @@ class AMDService:
             return AMDResult.ERROR, 0.0, {"error": "VAD not available"}
         
         start_time = time.time()
-        self.stats["total_analyses"] += 1
-        self.stats["python_decisions"] += 1
-        
-        # Accumulateurs pour analyse
-        total_speech_duration = 0.0
-        total_silence_duration = 0.0
-        current_speech_segment = 0.0
-        current_silence_segment = 0.0
-        longest_speech_segment = 0.0
-        speech_segments = []
-        in_speech = False
+        
         frame_duration_s = self.frame_duration_ms / 1000.0
         
-        # Détection de beep
-        beep_detected = False
-        beep_count = 0
+        # Détection de beep: toutes les frames valides analysées en un seul FFT batché
+        frame_bytes = self.frame_size * 2  # SLIN16 = 2 bytes par sample
+        valid_frames = [frame for frame in audio_frames if len(frame) == frame_bytes]
+        beep_flags = self._detect_beeps_batched(
+            np.frombuffer(b"".join(valid_frames), dtype=np.int16).reshape(-1, self.frame_size)
+        )
+        beep_count = int(beep_flags.sum())
+        beep_detected = beep_count >= 3  # Confirmer le beep
         
         # Transcription pour keywords (si Vosk disponible)
-        transcription = ""
+        transcription_parts: List[str] = []
         recognizer = None
-        if self.vosk_model:
+        if not beep_detected and self._ensure_vosk():
             recognizer = KaldiRecognizer(self.vosk_model, self.sample_rate)
             recognizer.SetWords(True)
         
-        # Analyser chaque frame
-        for i, frame in enumerate(audio_frames):
-            # Limite temporelle
-            elapsed = time.time() - start_time
-            if elapsed > max_analysis_time:
-                break
-                
-            if len(frame) != self.frame_size * 2:  # SLIN16 = 2 bytes par sample
-                continue
+        # Décisions VAD par frame (tableau préalloué, segmentation faite ensuite en un seul passage)
+        vad_flags = np.empty(len(valid_frames), dtype=np.uint8)
+        vad_count = 0
+        
+        # Beep confirmé = Machine quoi qu'il arrive: inutile de lancer VAD/Vosk
+        early_exit = "beep" if beep_detected else None
+        
+        # Analyser chaque frame (frames déjà validées en taille: un seul try autour de la boucle)
+        is_speech = self.vad.is_speech
+        sample_rate = self.sample_rate
+        # Tirade continue au-delà de ce nombre de frames = Machine (règle 3): Vosk n'apporte plus rien
+        machine_run_frames = int(_MACHINE_SPEECH_THRESHOLD / frame_duration_s)
+        speech_run = 0
+        try:
+            for frame in (() if beep_detected else valid_frames):
+                # Limite temporelle
+                if time.time() - start_time > max_analysis_time:
+                    break
                 
-            try:
                 # VAD - Voice Activity Detection
-                is_speech = self.vad.is_speech(frame, self.sample_rate)
+                speech = is_speech(frame, sample_rate)
+                vad_flags[vad_count] = speech
+                vad_count += 1
+                speech_run = speech_run + 1 if speech else 0
                 
-                if is_speech:
-                    if not in_speech:
-                        # Début d'un segment de parole
-                        if current_silence_segment > 0:
-                            total_silence_duration += current_silence_segment
-                            current_silence_segment = 0.0
-                        in_speech = True
-                    
-                    current_speech_segment += frame_duration_s
-                    total_speech_duration += frame_duration_s
-                    
-                else:
-                    if in_speech:
-                        # Fin d'un segment de parole
-                        speech_segments.append(current_speech_segment)
-                        longest_speech_segment = max(longest_speech_segment, current_speech_segment)
-                        total_speech_duration += current_speech_segment
-                        current_speech_segment = 0.0
-                        in_speech = False
-                    
-                    current_silence_segment += frame_duration_s
-                
-                # Détection de beep par analyse spectrale
-                if self._detect_beep_in_frame(frame):
-                    beep_count += 1
-                    if beep_count >= 3:  # Confirmer le beep
-                        beep_detected = True
-                        self.stats["beep_detections"] += 1
+                if recognizer and speech_run > machine_run_frames:
+                    recognizer = None
                 
                 # Transcription pour keywords
                 if recognizer and recognizer.AcceptWaveform(frame):
                     result = json.loads(recognizer.Result())
                     text = result.get("text", "")
                     if text:
-                        transcription += " " + text
+                        # Fragment mis en minuscules une seule fois; scan avec le fragment
+                        # précédent pour les mots-clés à cheval sur deux énoncés
+                        text = text.lower()
+                        window = f"{transcription_parts[-1]} {text}" if transcription_parts else text
+                        transcription_parts.append(text)
+                        # Mot-clé de répondeur entendu: décision Machine acquise, arrêt anticipé
+                        if vad_count >= _MIN_FRAMES_BEFORE_EXIT and self._match_vm_keywords(window):
+                            early_exit = "vm_keyword"
+                            break
                 
-            except Exception as e:
-                self.logger.warning(f"⚠️ Error processing AMD frame {i}: {e}")
-                continue
+            # Dernier énoncé en cours (pas encore émis par Result())
+            if recognizer and early_exit is None:
+                text = json.loads(recognizer.FinalResult()).get("text", "")
+                if text:
+                    transcription_parts.append(text.lower())
+                
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error processing AMD frame {vad_count}: {e}")
         
-        # Finaliser les segments en cours
-        if in_speech and current_speech_segment > 0:
-            speech_segments.append(current_speech_segment)
-            longest_speech_segment = max(longest_speech_segment, current_speech_segment)
+        # Transcription assemblée une seule fois (fragments déjà en minuscules)
+        transcription = " ".join(transcription_parts)
+        
+        # Segmentation parole/silence
+        total_speech_duration, total_silence_duration, longest_speech_segment, speech_segments = \
+            _scan_speech_segments(vad_flags[:vad_count], frame_duration_s)
         
         # Analyse finale
         analysis_time_ms = (time.time() - start_time) * 1000
-        self._update_analysis_time_stats(analysis_time_ms)
         
         # Détection de mots-clés de répondeur
-        vm_keywords_found = self._detect_vm_keywords(transcription)
-        if vm_keywords_found:
-            self.stats["keyword_detections"] += 1
+        vm_keywords_found = self._match_vm_keywords(transcription)
         
         # Logique de décision
         result, confidence = self._make_decision(
@@ -265,64 +321,75 @@ class AMDService:
             "vm_keywords_found": vm_keywords_found,
             "transcription": transcription.strip(),
             "frames_processed": len(audio_frames),
+            "early_exit": early_exit,
             "timestamp": time.time()
         }
         
-        # Mise à jour stats
-        if result == AMDResult.HUMAN:
-            self.stats["human_detected"] += 1
-        elif result == AMDResult.MACHINE:
-            self.stats["machine_detected"] += 1
-        else:
-            self.stats["uncertain_cases"] += 1
+        # Mise à jour stats (en un seul bloc)
+        counters = ["total_analyses", "python_decisions", _RESULT_COUNTERS.get(result, "uncertain_cases")]
+        if beep_detected:
+            counters.append("beep_detections")
+        if vm_keywords_found:
+            counters.append("keyword_detections")
+        self._record_stats(counters, analysis_time_ms)
         
         self.logger.debug(f"🤖 Python AMD: {result.value} ({confidence:.2f}) in {analysis_time_ms:.1f}ms")
         return result, confidence, metadata
 
-    def _detect_beep_in_frame(self, frame: bytes) -> bool:
-        """Détecte un beep de répondeur dans une frame audio"""
+    def _ensure_vosk(self):
+        """Charge le modèle Vosk à la première analyse qui en a besoin (une seule tentative)"""
+        if not self._vosk_loaded:
+            with self._vosk_lock:
+                if not self._vosk_loaded:
+                    if VOSK_AVAILABLE and hasattr(config, 'VOSK_MODEL_PATH'):
+                        try:
+                            self.vosk_model = Model(config.VOSK_MODEL_PATH)
+                            logger.info("✅ Vosk model loaded for AMD keyword detection")
+                        except Exception as e:
+                            logger.warning(f"⚠️ Failed to load Vosk for AMD: {e}")
+                    self._vosk_loaded = True
+        return self.vosk_model
+
+    def _detect_beeps_batched(self, frames_i16: np.ndarray) -> np.ndarray:
+        """Détecte un beep de répondeur dans chaque frame (une ligne par frame), en un seul FFT"""
+        if not len(frames_i16):
+            return np.zeros(0, dtype=np.int8)
+        
         try:
-            # Convertir en numpy array
-            audio_data = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
-            
-            # FFT pour analyse spectrale
-            spectrum = np.abs(np.fft.rfft(audio_data))
-            freqs = np.fft.rfftfreq(len(audio_data), 1/self.sample_rate)
-            
-            # Chercher pic entre 800-2000 Hz (fréquence beep typique)
-            beep_band = (freqs >= 800) & (freqs <= 2000)
-            other_band = freqs < 800
-            
-            if len(spectrum[beep_band]) == 0 or len(spectrum[other_band]) == 0:
-                return False
+            # FFT batchée sur toutes les frames (axe 1): une seule conversion float32, sans
+            # normalisation (ratio d'énergie invariant d'échelle); scipy.fft reste en simple précision
+            spectrum = np.abs(_fft.rfft(frames_i16.astype(np.float32), axis=1, **_FFT_KWARGS))
             
-            beep_energy = spectrum[beep_band].mean()
-            other_energy = spectrum[other_band].mean()
+            # Ratio énergie bande beep (800-2000 Hz) vs basses fréquences (< 800 Hz)
+            beep_energy = spectrum[:, self._beep_mask].mean(axis=1)
+            other_energy = spectrum[:, self._other_mask].mean(axis=1)
+            ratio = beep_energy / np.maximum(other_energy, 1e-9)
             
-            # Ratio énergie beep vs reste
-            if other_energy > 0:
-                ratio = beep_energy / other_energy
-                return ratio > 3.0  # Seuil ajustable
-            
-            return False
+            return ((ratio > 3.0) & (other_energy > 0)).astype(np.int8)  # Seuil ajustable
             
         except Exception as e:
             self.logger.debug(f"Error in beep detection: {e}")
-            return False
+            return np.zeros(len(frames_i16), dtype=np.int8)
 
     def _detect_vm_keywords(self, transcription: str) -> List[str]:
         """Détecte les mots-clés de répondeur dans la transcription"""
         if not transcription:
             return []
         
-        text_lower = transcription.lower()
-        found_keywords = []
+        return self._match_vm_keywords(transcription.lower())
+
+    def _match_vm_keywords(self, text_lower: str) -> List[str]:
+        """Recherche les mots-clés dans un texte déjà en minuscules"""
+        # Court-circuit: réponses humaines brèves ("oui", "allô"...) trop courtes pour un mot-clé
+        if len(text_lower) < _VM_MIN_KEYWORD_LEN:
+            return []
         
-        for keyword in self.vm_keywords:
-            if keyword in text_lower:
-                found_keywords.append(keyword)
+        # Aucun mot-clé présent (cas courant): un seul search, pas de boucle
+        if not _VM_KEYWORDS_RE.search(text_lower):
+            return []
         
-        return found_keywords
+        # Tous les mots-clés présents, chevauchements compris (la confiance dépend du nombre)
+        return [keyword for keyword in VM_KEYWORDS if keyword in text_lower]
 
     def _make_decision(self, total_speech_duration: float, total_silence_duration: float,
                       longest_speech_segment: float, speech_segments: List[float],
@@ -343,22 +410,20 @@ class AMDService:
             return AMDResult.MACHINE, min(confidence, 0.95)
         
         # Règle 3: Longue tirade initiale = Machine
-        if longest_speech_segment > config.AMD_MACHINE_SPEECH_THRESHOLD:
-            confidence = 0.8 + min((longest_speech_segment - config.AMD_MACHINE_SPEECH_THRESHOLD) * 0.1, 0.15)
+        if longest_speech_segment > _MACHINE_SPEECH_THRESHOLD:
+            confidence = 0.8 + min((longest_speech_segment - _MACHINE_SPEECH_THRESHOLD) * 0.1, 0.15)
             return AMDResult.MACHINE, confidence
         
         # Règle 4: Courte salutation = Humain
-        if longest_speech_segment < config.AMD_HUMAN_SPEECH_THRESHOLD:
-            # Vérifier qu'il y a bien eu de la parole
-            if total_speech_duration > 0.5:  # Au moins 500ms de parole
-                confidence = 0.75 + min((config.AMD_HUMAN_SPEECH_THRESHOLD - longest_speech_segment) * 0.1, 0.2)
-                return AMDResult.HUMAN, confidence
+        # (avec au moins 500ms de parole)
+        if longest_speech_segment < _HUMAN_SPEECH_THRESHOLD and total_speech_duration > 0.5:
+            confidence = 0.75 + min((_HUMAN_SPEECH_THRESHOLD - longest_speech_segment) * 0.1, 0.2)
+            return AMDResult.HUMAN, confidence
         
         # Règle 5: Pattern de pauses courtes = Humain (respiration)
-        if len(speech_segments) >= 2:
-            short_segments = [s for s in speech_segments if s < 1.0]  # Segments < 1s
-            if len(short_segments) >= 2:
-                return AMDResult.HUMAN, 0.7
+        # Au moins 2 segments < 1s, comptés sans construire de liste intermédiaire
+        if len(speech_segments) >= 2 and sum(1 for s in speech_segments if s < 1.0) >= 2:
+            return AMDResult.HUMAN, 0.7
         
         # Règle 6: Très peu de parole = Silence/Erreur
         if total_speech_duration < 0.3:
@@ -386,7 +451,7 @@ class AMDService:
         asterisk_result, asterisk_confidence, asterisk_metadata = self.analyze_asterisk_amd(amd_status, amd_cause)
         
         # Si Asterisk est sûr de sa décision et qu'on n'a pas d'audio, utiliser Asterisk
-        if asterisk_result in [AMDResult.MACHINE] and asterisk_confidence > 0.8:
+        if asterisk_result is AMDResult.MACHINE and asterisk_confidence > 0.8:
             if not audio_frames or not self.is_available:
                 return asterisk_result, asterisk_confidence, {
                     **asterisk_metadata,
@@ -409,7 +474,7 @@ class AMDService:
                 python_metadata = {"error": str(e)}
         
         # Étape 3: Combinaison des résultats
-        if python_result and python_result != AMDResult.ERROR:
+        if python_result is not None and python_result is not AMDResult.ERROR:
             final_result, final_confidence = self._combine_results(
                 asterisk_result, asterisk_confidence,
                 python_result, python_confidence
@@ -439,7 +504,7 @@ class AMDService:
         """Combine les résultats Asterisk et Python"""
         
         # Si les deux sont d'accord
-        if asterisk_result == python_result:
+        if asterisk_result is python_result:
             # Prendre la confiance la plus élevée
             combined_confidence = max(asterisk_confidence, python_confidence)
             return asterisk_result, combined_confidence
@@ -452,12 +517,12 @@ class AMDService:
         
         # Logique de priorité
         # Python MACHINE a priorité sur Asterisk HUMAN (plus précis)
-        if python_result == AMDResult.MACHINE and asterisk_result == AMDResult.HUMAN:
+        if python_result is AMDResult.MACHINE and asterisk_result is AMDResult.HUMAN:
             if python_confidence > 0.7:
                 return python_result, python_confidence
         
         # Asterisk MACHINE a priorité sur Python HUMAN (AMD hardware fiable)
-        if asterisk_result == AMDResult.MACHINE and python_result == AMDResult.HUMAN:
+        if asterisk_result is AMDResult.MACHINE and python_result is AMDResult.HUMAN:
             if asterisk_confidence > 0.7:
                 return asterisk_result, asterisk_confidence
         
@@ -467,6 +532,15 @@ class AMDService:
         else:
             return asterisk_result, asterisk_confidence
 
+    def _record_stats(self, counters, analysis_time_ms: Optional[float] = None):
+        """Incrémente les compteurs d'une analyse sous un seul verrou"""
+        stats = self.stats
+        with self._stats_lock:
+            for counter in counters:
+                stats[counter] += 1
+            if analysis_time_ms is not None:
+                self._update_analysis_time_stats(analysis_time_ms)
+
     def _update_analysis_time_stats(self, analysis_time_ms: float):
         """Met à jour les statistiques de temps d'analyse"""
         if self.stats["python_decisions"] == 1:
@@ -479,28 +553,39 @@ class AMDService:
 
     def get_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques du service AMD"""
-        total = self.stats["total_analyses"]
+        with self._stats_lock:
+            stats = dict(self.stats)
+        total = stats["total_analyses"]
         return {
-            **self.stats,
+            **stats,
             "is_available": self.is_available,
             "vad_available": VAD_AVAILABLE,
             "vosk_available": VOSK_AVAILABLE and self.vosk_model is not None,
-            "human_rate_percent": (self.stats["human_detected"] / max(total, 1)) * 100,
-            "machine_rate_percent": (self.stats["machine_detected"] / max(total, 1)) * 100,
-            "uncertainty_rate_percent": (self.stats["uncertain_cases"] / max(total, 1)) * 100
+            "human_rate_percent": (stats["human_detected"] / max(total, 1)) * 100,
+            "machine_rate_percent": (stats["machine_detected"] / max(total, 1)) * 100,
+            "uncertainty_rate_percent": (stats["uncertain_cases"] / max(total, 1)) * 100
         }
 
     def get_asterisk_amd_config(self) -> str:
         """Génère la configuration AMD pour Asterisk"""
         return f"""AMD({config.AMD_INITIAL_SILENCE},{config.AMD_GREETING},{config.AMD_AFTER_GREETING_SILENCE},{config.AMD_TOTAL_ANALYSIS_TIME},{config.AMD_MIN_WORD_LENGTH},{config.AMD_BETWEEN_WORDS_SILENCE})"""
 
-# Instance globale du service (singleton pattern)
-amd_service = AMDService()
+# Instance globale du service (singleton paresseux: rien n'est chargé à l'import)
+@lru_cache(maxsize=1)
+def get_amd_service() -> AMDService:
+    return AMDService()
+
+def __getattr__(name):
+    # Compatibilité: `from services.amd_service import amd_service` crée l'instance à la demande
+    if name == "amd_service":
+        return get_amd_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     # Test standalone
     def test_amd_service():
         logger.info("🧪 Testing AMD Service in standalone mode")
+        amd_service = get_amd_service()
         
         # Test 1: AMD Asterisk seul
         print("=== Test 1: Asterisk AMD Results ===")
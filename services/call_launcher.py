@@ -1,11 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter
 import config
 import uuid
-from datetime import datetime
+import time
+import asyncio
 from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+# Session HTTP partagée: connexions keep-alive réutilisées vers ARI (pas de connect TCP par appel)
+_session = requests.Session()
+_session.auth = (config.ARI_USERNAME, config.ARI_PASSWORD)
+_session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0))
+_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=0))
+
 def launch_call(phone_number: str, scenario: str = "basique", campaign_id: str = None) -> str:
     """
     Launch a call via Asterisk ARI
@@ -23,8 +31,8 @@ def launch_call(phone_number: str, scenario: str = "basique", campaign_id: str =
     """
     
     try:
-        # Generate unique call ID
-        call_id = f"robot_{uuid.uuid4().hex[:8]}_{int(datetime.now().timestamp())}"
+        # Generate unique call ID (uuid guarantees uniqueness, epoch seconds read directly)
+        call_id = f"robot_{uuid.uuid4().hex[:8]}_{int(time.time())}"
         
         logger.info(f"🚀 Launching call to {phone_number} with scenario {scenario}")
         
@@ -49,16 +57,13 @@ def launch_call(phone_number: str, scenario: str = "basique", campaign_id: str =
             }
         }
         
-        # Make the ARI request with authentication
-        auth = (config.ARI_USERNAME, config.ARI_PASSWORD)
-        
+        # Make the ARI request (authentication carried by the shared session)
         logger.info(f"📡 Making ARI request to: {ari_url}")
         logger.debug(f"📡 Request data: {data}")
         
-        response = requests.post(
+        response = _session.post(
             ari_url,
             json=data,
-            auth=auth,
             timeout=10
         )
         
@@ -87,6 +92,16 @@ def launch_call(phone_number: str, scenario: str = "basique", campaign_id: str =
         logger.error(f"❌ {error_msg}")
         raise Exception(error_msg)
 
+async def launch_call_async(phone_number: str, scenario: str = "basique", campaign_id: str = None) -> str:
+    """
+    Awaitable variant of launch_call for asyncio callers (API handlers)
+    
+    The blocking ARI request runs in a worker thread on the shared session,
+    so the event loop keeps serving while the call is being originated and
+    several launches can be awaited concurrently (asyncio.gather).
+    """
+    return await asyncio.to_thread(launch_call, phone_number, scenario, campaign_id)
+
 def test_ari_connection() -> bool:
     """
     Test connection to Asterisk ARI
@@ -96,11 +111,10 @@ def test_ari_connection() -> bool:
     """
     try:
         ari_url = f"{config.ARI_URL}/ari/asterisk/info"
-        auth = (config.ARI_USERNAME, config.ARI_PASSWORD)
         
         logger.info(f"🔍 Testing ARI connection to: {ari_url}")
         
-        response = requests.get(ari_url, auth=auth, timeout=5)
+        response = _session.get(ari_url, timeout=5)
         
         if response.status_code == 200:
             info = response.json()
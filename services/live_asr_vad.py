@@ -261,7 +261,7 @@ class LiveASRVAD:
                     latency_ms = (time.time() - start_time) * 1000
                     self._update_latency_stats(latency_ms)
                     
-                    self.logger.debug(f"📝 Final transcription for {channel_id}: '{text}' ({latency_ms:.1f}ms)")
+                    self.logger.debug("📝 Final transcription for %s: '%s' (%.1fms)", channel_id, text, latency_ms)
                     await self._notify_transcription(channel_id, text, "final", latency_ms)
                     
             else:
@@ -273,7 +273,7 @@ class LiveASRVAD:
                     stream_info["partial_transcription"] = partial_text
                     
                     latency_ms = (time.time() - start_time) * 1000
-                    self.logger.debug(f"📝 Partial transcription for {channel_id}: '{partial_text}' ({latency_ms:.1f}ms)")
+                    self.logger.debug("📝 Partial transcription for %s: '%s' (%.1fms)", channel_id, partial_text, latency_ms)
                     await self._notify_transcription(channel_id, partial_text, "partial", latency_ms)
             
         except Exception as e:
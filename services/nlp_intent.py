@@ -344,7 +344,7 @@ Réponds UNIQUEMENT en JSON: {{"intent": "...", "confidence": 0.9, "contextual_r
                     })
                     
                     mode_label = "🔄 Hybrid" if hybrid_mode else "🧠 Classic"
-                    self.logger.debug(f"{mode_label} Ollama intent: '{text_clean}' → {intent} ({confidence:.2f}) [{latency_ms:.1f}ms]")
+                    self.logger.debug("%s Ollama intent: '%s' → %s (%.2f) [%.1fms]", mode_label, text_clean, intent, confidence, latency_ms)
                     return intent, confidence, metadata
                     
             except Exception as e:
@@ -363,7 +363,7 @@ Réponds UNIQUEMENT en JSON: {{"intent": "...", "confidence": 0.9, "contextual_r
                     "latency_ms": latency_ms
                 })
                 
-                self.logger.debug(f"🔄 Fallback intent: '{text_clean}' → {intent} ({confidence:.2f}) [{latency_ms:.1f}ms]")
+                self.logger.debug("🔄 Fallback intent: '%s' → %s (%.2f) [%.1fms]", text_clean, intent, confidence, latency_ms)
                 return intent, confidence, metadata
                 
             except Exception as e:
@@ -378,7 +378,7 @@ Réponds UNIQUEMENT en JSON: {{"intent": "...", "confidence": 0.9, "contextual_r
             "latency_ms": latency_ms
         })
         
-        self.logger.debug(f"🔧 Keywords intent: '{text_clean}' → {intent} ({confidence:.2f}) [{latency_ms:.1f}ms]")
+        self.logger.debug("🔧 Keywords intent: '%s' → %s (%.2f) [%.1fms]", text_clean, intent, confidence, latency_ms)
         return intent, confidence, metadata
 
     def _get_intent_ollama(self, text: str, context: str) -> Tuple[str, float, Dict[str, Any]]:
@@ -700,7 +700,7 @@ Réponds EXACTEMENT dans ce format JSON:
                         
                         # Valider la structure
                         if "text" in result and "action" in result:
-                            self.logger.info(f"🤖 Ollama direct: {result['text'][:50]}... → {result['action']}")
+                            self.logger.info("🤖 Ollama direct: %.50s... → %s", result["text"], result["action"])
                             return result
                     
                 except json.JSONDecodeError:
@@ -6,9 +6,11 @@ Compatible avec streaming temps réel + enregistrement complet
 """
 
 import os
+import re
 import json
 import subprocess
 import tempfile
+import wave
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple
@@ -26,6 +28,14 @@ from config import RECORDINGS_PATH
 
 logger = get_logger(__name__)
 
+# Mots-clés typiques du bot (depuis audio_texts.json), compilés une seule fois
+BOT_KEYWORDS = (
+    "bonjour", "thierry", "france patrimoine", "association",
+    "merci", "parfait", "excellent", "intéressé", "rendez-vous",
+    "disponible", "bonne journée", "au revoir"
+)
+_BOT_KEYWORDS_RE = re.compile("|".join(sorted(map(re.escape, BOT_KEYWORDS), key=len, reverse=True)))
+
 class PostCallRecordingService:
     """
     Service de traitement post-appel pour enregistrements complets
@@ -43,12 +53,6 @@ class PostCallRecordingService:
         # Créer répertoires si nécessaires
         self.transcripts_path.mkdir(exist_ok=True)
         
-        # Charger audio_texts.json pour mapping bot
-        self.audio_texts = {}
-        if self.audio_texts_path.exists():
-            with open(self.audio_texts_path, 'r', encoding='utf-8') as f:
-                self.audio_texts = json.load(f)
-        
         # Initialiser Vosk si disponible
         self.vosk_available = self._init_vosk()
         
@@ -341,22 +345,13 @@ class PostCallRecordingService:
         Returns:
             True si bot, False si client
         """
-        # Mots-clés typiques du bot (depuis audio_texts.json)
-        bot_keywords = [
-            "bonjour", "thierry", "france patrimoine", "association",
-            "merci", "parfait", "excellent", "intéressé", "rendez-vous",
-            "disponible", "bonne journée", "au revoir"
-        ]
-        
         text_lower = text.lower()
         
         # Score bot
         bot_score = 0
         
-        # Critère 1: Mots-clés
-        for keyword in bot_keywords:
-            if keyword in text_lower:
-                bot_score += 2
+        # Critère 1: Mots-clés (un seul passage regex, chaque mot-clé compté une fois)
+        bot_score += 2 * len(set(_BOT_KEYWORDS_RE.findall(text_lower)))
         
         # Critère 2: Durée (bot généralement plus court)
         if duration < 3.0:
@@ -466,13 +461,7 @@ CONVERSATION:
         conversation = transcript_data.get("conversation_analysis", {})
         turns = conversation.get("turns", [])
         
-        for turn in turns:
-            speaker = turn.get("speaker", "UNKNOWN")
-            time_start = turn.get("start_time", 0)
-            text = turn.get("text", "")
-            confidence = turn.get("confidence", 0) * 100
-            
-            readable += f"[{time_start:06.1f}s] {speaker:6} ({confidence:04.1f}%): {text}\n"
+        readable += "".join(self._iter_turn_lines(turns))
         
         # Statistiques
         bot_duration = conversation.get("bot_duration", 0)
@@ -495,8 +484,28 @@ Généré par MiniBotPanel v2 - Transcription post-appel
         
         return readable
 
+    def _iter_turn_lines(self, turns: List[Dict]):
+        """Génère les lignes de conversation une à une (jointes en une seule fois)"""
+        for turn in turns:
+            speaker = turn.get("speaker", "UNKNOWN")
+            time_start = turn.get("start_time", 0)
+            text = turn.get("text", "")
+            confidence = turn.get("confidence", 0) * 100
+            
+            yield f"[{time_start:06.1f}s] {speaker:6} ({confidence:04.1f}%): {text}\n"
+
     def _get_audio_duration(self, file_path: str) -> float:
-        """Obtient la durée d'un fichier audio avec soxi"""
+        """Obtient la durée d'un fichier audio (en-tête WAV lu en process, soxi en repli)"""
+        try:
+            # Enregistrements MixMonitor en WAV PCM: durée lue dans l'en-tête, sans fork
+            with wave.open(file_path, 'rb') as wf:
+                return wf.getnframes() / wf.getframerate()
+        except (wave.Error, EOFError):
+            pass  # Format non PCM/non WAV: repli sur soxi
+        except Exception as e:
+            self.logger.warning(f"Could not get duration for {file_path}: {e}")
+            return 0.0
+        
         try:
             result = subprocess.run(
                 ["soxi", "-D", file_path],
@@ -519,7 +528,7 @@ Généré par MiniBotPanel v2 - Transcription post-appel
             "recordings_path": self.recordings_path,
             "transcripts_path": str(self.transcripts_path),
             "vps_ip": self.vps_ip,
-            "audio_texts_loaded": len(self.audio_texts) > 0
+            "audio_texts_loaded": self.audio_texts_path.exists()
         }
 
 
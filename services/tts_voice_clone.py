@@ -46,6 +46,9 @@ class VoiceCloneService:
         self.tts_model = None
         self.reference_voice_path = None
         self.voice_characteristics = {}
+        # Embedding voix (None = pas encore préparé), initialisé pour éviter les hasattr
+        self.use_embedding = None
+        self.embedding_path = None
         
         # Configuration TTS
         self.config = {
@@ -187,13 +190,16 @@ class VoiceCloneService:
                     "--speaker_wav", training_files[0]  # Utiliser le meilleur échantillon
                 ]
                 
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+                # Progression stdout ignorée (pas de pipe), stderr conservé pour diagnostic
+                result = subprocess.run(
+                    cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=300
+                )
                 
                 if result.returncode == 0 and self.embedding_path.exists():
                     self.use_embedding = True
                     self.logger.info("✅ Voice embedding generated successfully")
                 else:
-                    self.logger.warning("⚠️ Embedding generation failed, using direct WAV reference")
+                    self.logger.warning(f"⚠️ Embedding generation failed, using direct WAV reference: {result.stderr[-500:].strip()}")
                     self.use_embedding = False
                     
             except Exception as e:
@@ -224,7 +230,7 @@ class VoiceCloneService:
             self.logger.error("❌ TTS not available")
             return None
         
-        if not hasattr(self, 'use_embedding') and not self.reference_voice_path:
+        if self.use_embedding is None and not self.reference_voice_path:
             self.logger.error("❌ No voice reference available")
             return None
         
@@ -241,10 +247,10 @@ class VoiceCloneService:
             # Nettoyer le texte
             text_clean = self._clean_text_for_tts(text)
             
-            self.logger.debug(f"🎙️ Generating speech: '{text_clean[:50]}...'")
+            self.logger.debug("🎙️ Generating speech: '%.50s...'", text_clean)
             
             # Générer avec clonage vocal (embedding ou WAV direct)
-            if hasattr(self, 'use_embedding') and self.use_embedding and self.embedding_path.exists():
+            if self.use_embedding and self.embedding_path.exists():
                 # Utiliser l'embedding précomputé (plus rapide)
                 self.logger.debug("🧠 Using voice embedding for generation")
                 self.tts_model.tts_to_file(
@@ -355,12 +361,11 @@ class VoiceCloneService:
         }
         
         # Ajouter les informations d'embedding si disponibles
-        if hasattr(self, 'use_embedding'):
+        if self.use_embedding is not None:
             stats["embedding_available"] = self.use_embedding
-            stats["embedding_path"] = str(self.embedding_path) if hasattr(self, 'embedding_path') else None
+            stats["embedding_path"] = str(self.embedding_path) if self.embedding_path else None
         
-        if hasattr(self, 'voice_characteristics'):
-            stats["voice_characteristics"] = self.voice_characteristics
+        stats["voice_characteristics"] = self.voice_characteristics
         
         return stats
 
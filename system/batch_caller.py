@@ -132,9 +132,33 @@ def update_completed_calls(db):
 
     completed_count = 0
 
+    # Charger toutes les lignes calls du cycle en une seule requête (au lieu d'un SELECT par appel)
+    call_ids = [queue_item.call_id for queue_item in calling_queue]
+    calls_by_id = {}
+    if call_ids:
+        calls_by_id = {
+            call.call_id: call
+            for call in db.query(Call).filter(Call.call_id.in_(call_ids)).all()
+        }
+
+    # Charger en une requête les contacts des appels terminés (au lieu d'un SELECT par appel)
+    phones = [
+        queue_item.phone_number for queue_item in calling_queue
+        if queue_item.call_id in calls_by_id and calls_by_id[queue_item.call_id].ended_at
+    ]
+    contacts_by_phone = {}
+    if phones:
+        contacts_by_phone = {
+            contact.phone: contact
+            for contact in db.query(Contact).filter(Contact.phone.in_(phones)).all()
+        }
+
+    # Cache des campagnes pour ce cycle (plusieurs appels partagent la même campagne)
+    campaigns_cache = {}
+
     for queue_item in calling_queue:
         # Vérifier si l'appel est terminé dans la table calls
-        call_record = db.query(Call).filter(Call.call_id == queue_item.call_id).first()
+        call_record = calls_by_id.get(queue_item.call_id)
 
         if call_record and call_record.ended_at:
             # Appel terminé !
@@ -144,7 +168,7 @@ def update_completed_calls(db):
             logger.info(f"✅ Appel terminé: {queue_item.phone_number} (durée: {call_record.duration}s, sentiment: {call_record.final_sentiment})")
 
             # Mettre à jour le contact
-            contact = db.query(Contact).filter(Contact.phone == queue_item.phone_number).first()
+            contact = contacts_by_phone.get(queue_item.phone_number)
             if contact:
                 # CORRECTION: Si contact.status est toujours "Calling", le scénario n'a pas été exécuté
                 # (répondeur détecté par AMD avant le scénario, ou appel échoué immédiatement)
@@ -167,7 +191,11 @@ def update_completed_calls(db):
                 contact.transcript = f"Sentiment: {call_record.final_sentiment}, Interested: {call_record.is_interested}"
 
             # Mettre à jour les stats de campagne
-            campaign = db.query(Campaign).filter(Campaign.campaign_id == queue_item.campaign_id).first()
+            if queue_item.campaign_id not in campaigns_cache:
+                campaigns_cache[queue_item.campaign_id] = db.query(Campaign).filter(
+                    Campaign.campaign_id == queue_item.campaign_id
+                ).first()
+            campaign = campaigns_cache[queue_item.campaign_id]
             if campaign:
                 if call_record.status == "completed":
                     campaign.successful_calls += 1
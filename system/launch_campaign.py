@@ -127,6 +127,7 @@ def create_campaign_from_contacts(
 
         queued_count = 0
         failed_count = 0
+        queued_ids = []
 
         for contact in contacts:
             try:
@@ -142,14 +143,19 @@ def create_campaign_from_contacts(
 
                 db.add(queue_item)
                 queued_count += 1
-
-                # Mettre à jour le statut du contact
-                contact.status = "Queued"  # Nouveau statut pour indiquer qu'il est en file d'attente
+                queued_ids.append(contact.id)
 
             except Exception as e:
                 failed_count += 1
                 logger.error(f"❌ Erreur ajout contact {contact.phone}: {e}")
 
+        # Passer tous les contacts en file d'attente en un seul UPDATE
+        # (nouveau statut "Queued" pour indiquer qu'ils sont en file d'attente)
+        if queued_ids:
+            db.query(Contact).filter(Contact.id.in_(queued_ids)).update(
+                {"status": "Queued"}, synchronize_session=False
+            )
+
         # Commit tous les ajouts
         db.commit()
 